@@ -15,6 +15,13 @@ class Settings(BaseSettings):
     LANGSMITH_API_KEY: str              # LangSmith API 키
     LANGSMITH_PROJECT: str  # LangSmith 프로젝트 이름
 
+    # Prompt Settings
+    PROMPT_VERSION: str = "v3"  # app/prompts/ 아래에서 사용할 프롬프트 버전
+
+    # LLM Cassette Settings (녹화/재생)
+    LLM_CASSETTE_MODE: str = "off"  # off | record | replay
+    LLM_CASSETTE_PATH: str = "data/cassettes/llm_cassette.jsonl"  # 카세트 파일 경로
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
@@ -0,0 +1,389 @@
+# app/evals/prompt_regression.py
+
+"""
+프롬프트 버전 회귀 테스트 하네스.
+
+데이터셋의 에세이들을 지정한 프롬프트 버전(app/prompts/<version>)으로 LangGraph 파이프라인에 통과시키고,
+루브릭별 점수 분포 / 기준 버전 대비 루브릭별 일치율 / 지연 시간 및 LLM 호출 시간 합계를 리포트합니다.
+LLM 호출은 버전별 카세트(<cassette-dir>/<version>.jsonl)로 녹화/재생하므로,
+replay 모드에서는 네트워크 없이 몇 초 안에 결정적으로 끝납니다.
+
+사용 예:
+    # 1) 실제 LLM을 호출하며 카세트 녹화 (최초 1회, 또는 프롬프트를 수정했을 때 --prune으로 이전 엔트리 정리)
+    PYTHONPATH=. python -m app.evals.prompt_regression --versions v3 v2 v1 --mode record --cassette-model gpt-4o-mini --prune
+    # 2) CI 등에서 카세트만으로 재생 (녹화 때와 같은 --cassette-model 사용)
+    PYTHONPATH=. python -m app.evals.prompt_regression --versions v3 v2 v1 --mode replay --cassette-model gpt-4o-mini
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Dict, List, Optional
+
+from langsmith import tracing_context
+from pydantic import ValidationError
+
+from app.api.v1.schemas import EssayEvaluationRequest
+from app.services import llm_service
+from app.services.evaluation_service import app_graph, get_prompt_template
+from app.services.llm_cassette import LLMCassette
+
+RUBRIC_ITEMS = ["introduction", "body", "conclusion", "grammar"]
+SCORES = [0, 1, 2]
+
+# --- 1. 데이터셋 로더 ---
+# 엑셀(.xlsx)은 openpyxl 등 추가 의존성 없이 표준 라이브러리로 첫 번째 시트만 읽습니다.
+_XLSX_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+# OOXML 문자열 이스케이프 (_x000D_ = CR, _x005F_ = '_')
+_XLSX_ESCAPE = re.compile(r"_x([0-9A-Fa-f]{4})_")
+
+
+def _column_index(cell_ref: str) -> int:
+    """'C12' 같은 셀 참조에서 0부터 시작하는 열 번호를 계산합니다."""
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _xlsx_text(element: ET.Element) -> str:
+    """<si>/<is> 요소의 텍스트(<t>)를 이어 붙이고 _xHHHH_ 이스케이프를 디코딩합니다."""
+    text = "".join(t.text or "" for t in element.iter(f"{{{_XLSX_NS['main']}}}t"))
+    return _XLSX_ESCAPE.sub(lambda m: chr(int(m.group(1), 16)), text)
+
+
+def _first_sheet_path(z: zipfile.ZipFile) -> str:
+    """workbook.xml의 첫 번째 시트를 workbook.xml.rels로 찾아 zip 내부 경로를 반환합니다."""
+    workbook = ET.fromstring(z.read("xl/workbook.xml"))
+    sheet = workbook.find("main:sheets/main:sheet", _XLSX_NS)
+    rel_id = sheet.get(f"{{{_XLSX_NS['r']}}}id")
+
+    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.findall("rel:Relationship", _XLSX_NS):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            # Target은 xl/ 기준 상대 경로이거나 '/'로 시작하는 패키지 절대 경로
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    raise ValueError(f"Cannot resolve the first worksheet (relationship '{rel_id}') in the workbook.")
+
+
+def _read_xlsx_rows(path: str) -> List[List[str]]:
+    with zipfile.ZipFile(path) as z:
+        shared_strings = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            root = ET.fromstring(z.read("xl/sharedStrings.xml"))
+            shared_strings = [_xlsx_text(si) for si in root.findall("main:si", _XLSX_NS)]
+
+        sheet = ET.fromstring(z.read(_first_sheet_path(z)))
+        rows = []
+        for row in sheet.iter(f"{{{_XLSX_NS['main']}}}row"):
+            values: Dict[int, str] = {}
+            for cell in row.findall("main:c", _XLSX_NS):
+                cell_type = cell.get("t")
+                if cell_type == "inlineStr":
+                    value = _xlsx_text(cell)
+                else:
+                    v = cell.find("main:v", _XLSX_NS)
+                    value = "" if v is None else (v.text or "")
+                    if cell_type == "s" and value:
+                        value = shared_strings[int(value)]
+                values[_column_index(cell.get("r", ""))] = value
+            rows.append([values.get(i, "") for i in range(max(values, default=-1) + 1)])
+        return rows
+
+
+def load_dataset(path: str) -> List[dict]:
+    """
+    .xlsx 또는 .csv 데이터셋을 읽어 에세이 목록을 반환합니다.
+    필수 컬럼: essay_id, rubric_level(또는 level_group), topic_prompt, submit_text
+    """
+    if path.endswith(".xlsx"):
+        rows = _read_xlsx_rows(path)
+    elif path.endswith(".csv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.reader(f))
+    else:
+        raise ValueError(f"Unsupported dataset format: '{path}'. Use .xlsx or .csv.")
+
+    if not rows:
+        return []
+    header = [h.strip() for h in rows[0]]
+    essays = []
+    for row in rows[1:]:
+        record = dict(zip(header, row))
+        if not any(record.values()):
+            continue  # 빈 행은 건너뜀
+        essays.append({
+            "essay_id": str(record.get("essay_id") or len(essays)),
+            "level_group": record.get("rubric_level") or record.get("level_group", ""),
+            "topic_prompt": record.get("topic_prompt", ""),
+            "submit_text": record.get("submit_text", ""),
+        })
+    return essays
+
+
+# --- 2. 프롬프트 버전 하나를 데이터셋 전체에 실행 ---
+async def run_prompt_version(essays: List[dict], prompt_version: str, cassette: LLMCassette) -> dict:
+    """
+    한 프롬프트 버전으로 모든 에세이를 순차 평가합니다.
+    에세이별 지연 시간을 정확히 측정하기 위해 동시 실행하지 않습니다.
+    """
+    previous_cassette = llm_service.set_cassette(cassette)
+    results = {}
+    try:
+        for essay in essays:
+            calls_before = len(cassette.served_calls)
+            started_at = time.perf_counter()
+            record = {"scores": {}, "error": None}
+            try:
+                request = EssayEvaluationRequest(
+                    level_group=essay["level_group"],
+                    topic_prompt=essay["topic_prompt"],
+                    submit_text=essay["submit_text"],
+                )
+            except ValidationError as e:
+                # API에서 422로 거절되는 입력 (빈 level_group 등) - 평가 대상에서 제외
+                record["error"] = f"validation_error: {e.errors()[0]['msg']}"
+                record.update(wall_ms=0.0, llm_est_ms=0.0, llm_total_ms=0.0)
+                results[essay["essay_id"]] = record
+                continue
+
+            try:
+                final_state = await app_graph.ainvoke({"request": request, "prompt_version": prompt_version})
+                if final_state.get("error_message"):
+                    # 전처리 단계에서 걸러진 에세이 (언어/빈 값 등) - 평가 대상에서 제외
+                    record["error"] = f"{final_state.get('error_type')}: {final_state['error_message']}"
+                else:
+                    record["scores"] = {item.rubric_item: item.score for item in final_state["final_results"]}
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                record["failed"] = True
+
+            record["wall_ms"] = (time.perf_counter() - started_at) * 1000
+            record.update(summarize_call_latency(cassette.served_calls[calls_before:]))
+            results[essay["essay_id"]] = record
+    finally:
+        llm_service.set_cassette(previous_cassette)
+    return results
+
+
+# --- 3. 리포트 계산 ---
+def summarize_call_latency(calls: List[dict]) -> dict:
+    """
+    한 에세이의 LLM 호출들(카세트에 기록된 원래 지연 시간)을 루브릭별로 묶어 지연 시간을 계산합니다.
+    그래프는 서론→본론→결론을 순차 실행하고 문법을 병렬로 실행하므로,
+    예상 end-to-end LLM 지연은 max(서론 + 본론 + 결론, 문법)입니다.
+    """
+    by_rubric = {rubric_item: 0.0 for rubric_item in RUBRIC_ITEMS}
+    for call in calls:
+        # user_prompt에 "... for the '<rubric_item>' rubric item." 형태로 루브릭 이름이 들어 있음
+        for rubric_item in RUBRIC_ITEMS:
+            if f"'{rubric_item}'" in call["user_prompt"]:
+                by_rubric[rubric_item] += call["latency_ms"]
+                break
+
+    structure_ms = by_rubric["introduction"] + by_rubric["body"] + by_rubric["conclusion"]
+    return {
+        "llm_ms_by_rubric": {rubric_item: round(ms, 1) for rubric_item, ms in by_rubric.items()},
+        "llm_est_ms": max(structure_ms, by_rubric["grammar"]),
+        "llm_total_ms": sum(call["latency_ms"] for call in calls),
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize_version(results: Dict[str, dict]) -> dict:
+    """루브릭별 점수 분포와 지연 시간 통계를 계산합니다."""
+    scored = [r["scores"] for r in results.values() if r["scores"]]
+    distributions = {}
+    for rubric_item in RUBRIC_ITEMS:
+        values = [scores[rubric_item] for scores in scored if rubric_item in scores]
+        counts = Counter(values)
+        distributions[rubric_item] = {
+            "counts": {str(score): counts.get(score, 0) for score in SCORES},
+            "mean": round(statistics.mean(values), 3) if values else None,
+        }
+
+    # 지연 시간은 실제로 채점까지 끝난 에세이만 대상으로 집계
+    wall_ms = [r["wall_ms"] for r in results.values() if r["scores"]]
+    llm_est_ms = [r["llm_est_ms"] for r in results.values() if r["scores"]]
+    llm_total_ms = [r["llm_total_ms"] for r in results.values() if r["scores"]]
+    return {
+        "essays": len(results),
+        "scored": len(scored),
+        "skipped": sum(1 for r in results.values() if r["error"] and not r.get("failed")),
+        "failed": sum(1 for r in results.values() if r.get("failed")),
+        "distributions": distributions,
+        "latency_ms": {
+            # 카세트에 기록된 호출별 지연으로 추정한 에세이당 end-to-end LLM 지연 (replay 시에도 유효)
+            "est_mean": round(statistics.mean(llm_est_ms), 1) if llm_est_ms else 0.0,
+            "est_p95": round(_percentile(llm_est_ms, 0.95), 1),
+            # 이번 실행의 실제 소요 시간 (replay 시에는 로컬 처리 시간만 반영)
+            "wall_mean": round(statistics.mean(wall_ms), 1) if wall_ms else 0.0,
+            "wall_p95": round(_percentile(wall_ms, 0.95), 1),
+            # 에세이당 LLM 호출 4건의 시간 합계 (카세트에 기록된 원래 값).
+            # grammar 호출은 구조 평가와 병렬로 실행되므로 end-to-end 지연이 아니라 LLM 사용량 지표입니다.
+            "llm_total_mean": round(statistics.mean(llm_total_ms), 1) if llm_total_ms else 0.0,
+            "llm_total_p95": round(_percentile(llm_total_ms, 0.95), 1),
+        },
+    }
+
+
+def compute_agreement(baseline: Dict[str, dict], candidate: Dict[str, dict]) -> dict:
+    """
+    기준 버전 대비 루브릭별 일치율을 계산합니다.
+    - exact: 점수가 완전히 같은 비율
+    - adjacent: 점수 차이가 1점 이내인 비율
+    """
+    agreement = {}
+    for rubric_item in RUBRIC_ITEMS:
+        pairs = [
+            (baseline[essay_id]["scores"][rubric_item], record["scores"][rubric_item])
+            for essay_id, record in candidate.items()
+            if rubric_item in record["scores"]
+            and essay_id in baseline and rubric_item in baseline[essay_id]["scores"]
+        ]
+        agreement[rubric_item] = {
+            "n": len(pairs),
+            "exact": round(sum(a == b for a, b in pairs) / len(pairs), 3) if pairs else None,
+            "adjacent": round(sum(abs(a - b) <= 1 for a, b in pairs) / len(pairs), 3) if pairs else None,
+        }
+    return agreement
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Dataset: {report['dataset']} | mode: {report['mode']} | baseline: {report['baseline']}"]
+    for version, summary in report["versions"].items():
+        latency = summary["latency_ms"]
+        cassette = summary["cassette"]
+        lines.append("")
+        lines.append(
+            f"[{version}] essays={summary['essays']} scored={summary['scored']} "
+            f"skipped={summary['skipped']} failed={summary['failed']} "
+            f"| cassette hits={cassette['hits']} misses={cassette['misses']} pruned={cassette['pruned']} "
+            f"| wall {summary['elapsed_s']:.2f}s"
+        )
+        lines.append(
+            f"  est. latency/essay (max(intro+body+conclusion, grammar)): "
+            f"mean={latency['est_mean']}ms p95={latency['est_p95']}ms"
+        )
+        lines.append(f"  wall time/essay (this run): mean={latency['wall_mean']}ms p95={latency['wall_p95']}ms")
+        lines.append(
+            f"  llm call time/essay (sum of calls, not latency): "
+            f"mean={latency['llm_total_mean']}ms p95={latency['llm_total_p95']}ms"
+        )
+        lines.append(f"  {'rubric':<14}{'0':>5}{'1':>5}{'2':>5}{'mean':>8}{'exact':>8}{'adj':>8}")
+        for rubric_item in RUBRIC_ITEMS:
+            dist = summary["distributions"][rubric_item]
+            agree = summary.get("agreement", {}).get(rubric_item, {})
+            exact = "-" if agree.get("exact") is None else f"{agree['exact']:.0%}"
+            adjacent = "-" if agree.get("adjacent") is None else f"{agree['adjacent']:.0%}"
+            mean = "-" if dist["mean"] is None else f"{dist['mean']:.2f}"
+            counts = dist["counts"]
+            lines.append(
+                f"  {rubric_item:<14}{counts['0']:>5}{counts['1']:>5}{counts['2']:>5}{mean:>8}{exact:>8}{adjacent:>8}"
+            )
+    return "\n".join(lines)
+
+
+# --- 4. 전체 실행 ---
+async def run_regression(
+    dataset_path: str,
+    versions: List[str],
+    mode: str,
+    cassette_dir: str,
+    limit: Optional[int] = None,
+    cassette_model: Optional[str] = None,
+    prune: bool = False,
+) -> dict:
+    """
+    여러 프롬프트 버전을 실행하고 리포트를 만듭니다. 첫 번째 버전이 일치율 계산의 기준(baseline)입니다.
+    """
+    for version in versions:
+        get_prompt_template(version)  # 존재하지 않는 버전이면 TemplateNotFound로 즉시 실패
+
+    essays = load_dataset(dataset_path)[:limit]
+    report = {"dataset": dataset_path, "mode": mode, "baseline": versions[0], "versions": {}}
+    all_results = {}
+
+    for version in versions:
+        cassette = LLMCassette(os.path.join(cassette_dir, f"{version}.jsonl"), mode, model=cassette_model)
+        started_at = time.perf_counter()
+        if mode == "replay":
+            # 재생 시에는 LangSmith 추적도 끄고 네트워크를 전혀 사용하지 않음
+            with tracing_context(enabled=False):
+                results = await run_prompt_version(essays, version, cassette)
+        else:
+            results = await run_prompt_version(essays, version, cassette)
+
+        summary = summarize_version(results)
+        summary["elapsed_s"] = time.perf_counter() - started_at
+        summary["cassette"] = {"path": cassette.path, "hits": cassette.hits, "misses": cassette.misses, "pruned": 0}
+        # 실패한 에세이가 있으면 그 에세이의 기존 녹화본까지 지워질 수 있으므로 정리하지 않음
+        if prune and not summary["failed"]:
+            summary["cassette"]["pruned"] = cassette.prune()
+        if version != versions[0]:
+            summary["agreement"] = compute_agreement(all_results[versions[0]], results)
+        summary["errors"] = {essay_id: r["error"] for essay_id, r in results.items() if r["error"]}
+
+        all_results[version] = results
+        report["versions"][version] = summary
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run prompt versions over a dataset with LLM record/replay.")
+    parser.add_argument("--dataset", default="data/essay_writing_40_sample.xlsx", help="평가할 데이터셋 (.xlsx/.csv)")
+    parser.add_argument("--versions", nargs="+", default=["v3"], help="실행할 프롬프트 버전 (첫 번째가 기준)")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay", help="카세트 모드")
+    parser.add_argument("--cassette-dir", default="data/cassettes", help="버전별 카세트(<version>.jsonl) 디렉토리")
+    parser.add_argument(
+        "--cassette-model", default=None,
+        help="카세트 키에 쓸 모델명 (기본: AZURE_OPENAI_DEPLOYMENT_NAME). 녹화/재생 시 같은 값을 써야 합니다."
+    )
+    parser.add_argument(
+        "--prune", action="store_true",
+        help="record 후 이번 실행에서 쓰이지 않은 카세트 엔트리를 삭제 (데이터셋 전체 실행 시에만 사용)"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N개의 에세이만 실행")
+    parser.add_argument("--output", default=None, help="리포트를 JSON 파일로 저장할 경로")
+    args = parser.parse_args(argv)
+    if args.prune and (args.mode != "record" or args.limit is not None):
+        parser.error("--prune requires --mode record and cannot be combined with --limit.")
+
+    report = asyncio.run(run_regression(
+        args.dataset, args.versions, args.mode, args.cassette_dir, args.limit, args.cassette_model, args.prune
+    ))
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    # 카세트 미스 등으로 평가 자체가 실패한 에세이가 있으면 CI에서 실패 처리
+    return 1 if any(summary["failed"] for summary in report["versions"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,12 +10,14 @@ from jinja2 import Environment, FileSystemLoader
 from langgraph.graph import StateGraph, END
 
 from app.api.v1.schemas import EssayEvaluationRequest, EvaluationResultItem, CorrectionDetail
+from app.core.config import settings
 from app.services.llm_service import get_structured_evaluation
 
 # --- 1. LangGraph의 State 정의 ---
 # 그래프의 각 단계를 거치며 데이터가 저장되고 업데이트될 '메모리'
 class EvaluationState(TypedDict):
     request: EssayEvaluationRequest
+    prompt_version: Optional[str]  # 비어 있으면 settings.PROMPT_VERSION 사용
     word_count: int
     is_valid_language: bool
     
@@ -37,15 +39,20 @@ class EvaluationState(TypedDict):
     error_type: Optional[str]
     
 
-# --- Jinja2 템플릿 로더 (기존과 동일) ---
-env = Environment(loader=FileSystemLoader("app/prompts/v3"))
-template = env.get_template("rubric_evaluation.md")
+# --- Jinja2 템플릿 로더 ---
+# app/prompts/<version>/rubric_evaluation.md 형태로 버전별 프롬프트를 관리
+env = Environment(loader=FileSystemLoader("app/prompts"))
+
+def get_prompt_template(prompt_version: Optional[str] = None):
+    """프롬프트 버전(v1, v2, v3 ...)에 해당하는 루브릭 평가 템플릿을 반환합니다."""
+    return env.get_template(f"{prompt_version or settings.PROMPT_VERSION}/rubric_evaluation.md")
 
 # --- 단일 평가 로직 (재사용을 위해 별도 함수로 분리) ---
 async def _run_single_evaluation(
     request: EssayEvaluationRequest, 
     rubric_item: str,
-    include_level_info: bool = True
+    include_level_info: bool = True,
+    prompt_version: Optional[str] = None
 ) -> EvaluationResultItem:
     template_data = {
         "rubric_item": rubric_item,
@@ -57,7 +64,7 @@ async def _run_single_evaluation(
     else:
         template_data["level_group"] = "general (grammar focus)"
 
-    system_prompt = template.render(**template_data)
+    system_prompt = get_prompt_template(prompt_version).render(**template_data)
     user_prompt = f"Please evaluate the provided essay for the '{rubric_item}' rubric item."
     
     llm_output = await get_structured_evaluation(system_prompt, user_prompt)
@@ -180,12 +187,13 @@ async def evaluate_structure_sequentially(state: EvaluationState) -> dict:
     """노드 2: 구조 평가 - 서론, 본론, 결론을 순차적으로 실행하고 핵심 이슈를 분석"""
     print("--- Executing Node: evaluate_structure_sequentially ---")
     request = state['request']
+    prompt_version = state.get('prompt_version')
     level = request.level_group
 
     # 1. 순차 평가 실행
-    introduction_eval = await _run_single_evaluation(request, "introduction")
-    body_eval = await _run_single_evaluation(request, "body")
-    conclusion_eval = await _run_single_evaluation(request, "conclusion")
+    introduction_eval = await _run_single_evaluation(request, "introduction", prompt_version=prompt_version)
+    body_eval = await _run_single_evaluation(request, "body", prompt_version=prompt_version)
+    conclusion_eval = await _run_single_evaluation(request, "conclusion", prompt_version=prompt_version)
 
     # 2. LLM 평가 결과를 바탕으로 핵심 이슈 분석
     intro_has_core_issue = analyze_for_core_issue(level, introduction_eval.corrections)
@@ -207,7 +215,9 @@ async def evaluate_grammar_in_parallel(state: EvaluationState) -> dict:
     print("--- Executing Node: evaluate_grammar_in_parallel ---")
     request = state['request']
     # 문법 평가는 level_group 정보가 덜 중요하므로 False로 설정 
-    grammar_eval = await _run_single_evaluation(request, "grammar", include_level_info=False)
+    grammar_eval = await _run_single_evaluation(
+        request, "grammar", include_level_info=False, prompt_version=state.get('prompt_version')
+    )
     return {"grammar_eval": grammar_eval}
 
 async def post_evaluate_and_synthesize(state: EvaluationState) -> dict:
@@ -311,9 +321,12 @@ app_graph = workflow.compile()
 
 
 # --- 5. 최종 API 서비스 함수 (이 함수를 API 엔드포인트에서 호출) ---
-async def evaluate_essay_with_graph(request: EssayEvaluationRequest) -> List[EvaluationResultItem]:
+async def evaluate_essay_with_graph(
+    request: EssayEvaluationRequest,
+    prompt_version: Optional[str] = None
+) -> List[EvaluationResultItem]:
     """LangGraph로 컴파일된 평가 파이프라인을 실행하고, 에러 유형에 따라 다르게 처리합니다."""
-    initial_state = {"request": request}
+    initial_state = {"request": request, "prompt_version": prompt_version}
     
     try:
         # 그래프 실행
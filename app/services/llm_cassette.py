@@ -0,0 +1,135 @@
+# app/services/llm_cassette.py
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from app.api.v1.schemas import RubricEvaluationOutput
+
+# 카세트 동작 모드
+# - off: 카세트를 사용하지 않고 항상 LLM을 호출
+# - record: 카세트에 있으면 재생, 없으면 LLM을 호출한 뒤 결과를 카세트에 추가
+# - replay: 카세트에서만 응답을 꺼내오며, 없으면 CassetteMissError 발생 (네트워크 호출 없음)
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(Exception):
+    """replay 모드에서 요청에 해당하는 녹화본이 카세트에 없을 때 발생합니다."""
+
+
+def make_cassette_key(request: Dict[str, Any]) -> str:
+    """요청(모델, LLM 설정, 출력 스키마, system/user 프롬프트)을 정규화한 뒤 sha256 해시로 카세트 키를 만듭니다."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCassette:
+    """
+    LLM 요청-응답 쌍을 JSON Lines 파일에 녹화하고 재생하는 카세트.
+    한 줄에 하나의 엔트리({"key", "latency_ms", "response"})를 저장하며,
+    프롬프트 원문 대신 해시 키만 보관하여 파일을 작게 유지합니다.
+    model을 지정하면 요청의 모델명 대신 이 값으로 키를 만들어, 배포 이름 환경 변수와 무관하게 재생할 수 있습니다.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", model: Optional[str] = None):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Expected one of {CASSETTE_MODES}.")
+        self.path = path
+        self.mode = mode
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        # 카세트에서 재생했거나 새로 녹화한 호출 목록 ({"user_prompt", "latency_ms"}), 호출 순서대로 쌓임
+        self.served_calls: List[dict] = []
+        self._entries: Dict[str, dict] = {}
+        # 이번 실행에서 재생/녹화한 키 (prune 시 남길 엔트리)
+        self._used_keys: Set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                # 같은 키가 여러 번 녹화된 경우 마지막 엔트리가 우선
+                self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def served_latency_ms(self) -> float:
+        """재생/녹화한 호출들의 (원래) LLM 지연 시간 합계."""
+        return sum(call["latency_ms"] for call in self.served_calls)
+
+    def _key(self, request: Dict[str, Any]) -> str:
+        if self.model is not None:
+            request = {**request, "model": self.model}
+        return make_cassette_key(request)
+
+    def lookup(self, request: Dict[str, Any]) -> Optional[RubricEvaluationOutput]:
+        """녹화된 응답을 찾아 반환합니다. replay 모드에서 찾지 못하면 CassetteMissError를 발생시킵니다."""
+        key = self._key(request)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if self.mode == "replay":
+                raise CassetteMissError(
+                    f"No recorded response in cassette '{self.path}' for this request. "
+                    f"Re-run in 'record' mode to capture it."
+                )
+            return None
+
+        self.hits += 1
+        self._used_keys.add(key)
+        self.served_calls.append({"user_prompt": request.get("user_prompt", ""), "latency_ms": entry.get("latency_ms", 0.0)})
+        return RubricEvaluationOutput.model_validate(entry["response"])
+
+    def record(self, request: Dict[str, Any], response: RubricEvaluationOutput, latency_ms: float) -> None:
+        """새 요청-응답 쌍을 메모리와 카세트 파일에 추가합니다."""
+        entry = {
+            "key": self._key(request),
+            "latency_ms": round(latency_ms, 1),
+            "response": response.model_dump(),
+        }
+        self._entries[entry["key"]] = entry
+        self._used_keys.add(entry["key"])
+        self.served_calls.append({"user_prompt": request.get("user_prompt", ""), "latency_ms": latency_ms})
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def prune(self) -> int:
+        """
+        이번 실행에서 사용하지 않은 엔트리를 지우고 카세트 파일을 다시 씁니다. 지운 엔트리 수를 반환합니다.
+        프롬프트를 수정한 뒤 재녹화하면 더 이상 재생될 수 없는 이전 엔트리가 쌓이므로,
+        데이터셋 전체를 record 모드로 실행한 직후에만 호출해야 합니다.
+        """
+        stale_keys = [key for key in self._entries if key not in self._used_keys]
+        if not stale_keys:
+            return 0
+        for key in stale_keys:
+            del self._entries[key]
+
+        # 임시 파일에 쓴 뒤 교체하여, 중간에 실패해도 기존 카세트가 깨지지 않도록 함
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+        return len(stale_keys)
+
+
+def load_cassette(path: str, mode: str) -> Optional[LLMCassette]:
+    """설정값으로부터 카세트를 생성합니다. mode가 'off'이면 None을 반환합니다."""
+    if mode == "off":
+        return None
+    return LLMCassette(path, mode)
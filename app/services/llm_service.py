@@ -1,9 +1,13 @@
 # app/services/llm_service.py
 
+import time
+from typing import Optional
+
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from app.core.config import settings
 from app.api.v1.schemas import RubricEvaluationOutput
+from app.services.llm_cassette import LLMCassette, load_cassette
 
 # 1. LangChain의 AzureChatOpenAI 클라이언트 초기화
 # LangSmith 환경 변수가 설정되어 있으면 자동으로 모든 호출이 추적
@@ -28,16 +32,46 @@ chain = ChatPromptTemplate.from_messages([
     ("user", "{user_prompt}")
 ]) | structured_llm
 
+# 4. 녹화/재생(cassette) 레이어
+# LLM_CASSETTE_MODE가 'record' 또는 'replay'이면 요청-응답 쌍을 카세트 파일로 기록/재생합니다.
+# 프롬프트 버전 회귀 테스트처럼 같은 요청을 반복할 때 네트워크 없이 결정적인 결과를 얻을 수 있습니다.
+cassette: Optional[LLMCassette] = load_cassette(settings.LLM_CASSETTE_PATH, settings.LLM_CASSETTE_MODE)
+
+def set_cassette(new_cassette: Optional[LLMCassette]) -> Optional[LLMCassette]:
+    """사용할 카세트를 교체하고 이전 카세트를 반환합니다. None이면 카세트를 끕니다."""
+    global cassette
+    previous, cassette = cassette, new_cassette
+    return previous
+
 async def get_structured_evaluation(system_prompt: str, user_prompt: str) -> RubricEvaluationOutput:
     """
     LangChain을 사용하여 LLM을 비동기적으로 호출하고 구조화된 평가 결과를 받습니다.
+    카세트가 켜져 있으면 녹화된 응답을 먼저 찾아보고, 없을 때만 LLM을 호출합니다.
     """
+    # 응답에 영향을 주는 값(출력 스키마, LLM 설정)이 바뀌면 키도 바뀌어 이전 녹화본이 재생되지 않도록 함
+    cassette_request = {
+        "model": settings.AZURE_OPENAI_DEPLOYMENT_NAME,
+        "api_version": settings.AZURE_OPENAI_API_VERSION,
+        "temperature": llm.temperature,
+        "output_schema": RubricEvaluationOutput.model_json_schema(),
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+    }
+    if cassette is not None:
+        # replay 모드에서 녹화본이 없으면 CassetteMissError가 그대로 전파됩니다.
+        recorded = cassette.lookup(cassette_request)
+        if recorded is not None:
+            return recorded
+
     try:
         # 미리 정의된 체인을 비동기적으로 실행합니다.
+        started_at = time.perf_counter()
         response = await chain.ainvoke({
             "system_prompt": system_prompt,
             "user_prompt": user_prompt
         })
+        if cassette is not None:
+            cassette.record(cassette_request, response, (time.perf_counter() - started_at) * 1000)
         return response
     except Exception as e:
         print(f"Error calling LangChain chain: {e}")
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.api.v1.schemas import RubricEvaluationOutput, CorrectionDetail, EssayEvaluationRequest
+from app.services import evaluation_service, llm_service
+from app.services.llm_cassette import LLMCassette, CassetteMissError, load_cassette
+
+pytestmark = pytest.mark.asyncio
+
+# --- Fixtures ---
+
+@pytest.fixture
+def cassette_request() -> dict:
+    """카세트 키 생성에 사용되는 요청 데이터."""
+    return {"model": "gpt-4o-mini", "system_prompt": "You are an evaluator.", "user_prompt": "Evaluate 'body'."}
+
+@pytest.fixture
+def llm_output() -> RubricEvaluationOutput:
+    return RubricEvaluationOutput(
+        score=1,
+        corrections=[CorrectionDetail(highlight="I want go", issue="missing to", correction="I want to go")],
+        feedback="Recorded feedback."
+    )
+
+# --- Cassette Tests ---
+
+async def test_cassette_record_then_replay(tmp_path, cassette_request: dict, llm_output: RubricEvaluationOutput):
+    """record 모드에서 기록한 응답을 새로 연 replay 카세트가 그대로 재생하는지 테스트합니다."""
+    path = str(tmp_path / "cassettes" / "v3.jsonl")
+    recorder = LLMCassette(path, mode="record")
+    assert recorder.lookup(cassette_request) is None
+    recorder.record(cassette_request, llm_output, latency_ms=1234.5)
+
+    # 프롬프트 원문은 저장하지 않고 해시 키만 저장
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert len(entries) == 1
+    assert "system_prompt" not in entries[0]
+
+    player = LLMCassette(path, mode="replay")
+    assert player.lookup(cassette_request) == llm_output
+    assert player.hits == 1
+    assert player.served_latency_ms == 1234.5
+
+async def test_cassette_replay_miss(tmp_path, cassette_request: dict):
+    """replay 모드에서 녹화본이 없으면 CassetteMissError를 발생시키는지 테스트합니다."""
+    player = LLMCassette(str(tmp_path / "empty.jsonl"), mode="replay")
+    with pytest.raises(CassetteMissError):
+        player.lookup(cassette_request)
+    assert player.misses == 1
+
+async def test_cassette_prune_removes_unused_entries(tmp_path, cassette_request: dict, llm_output: RubricEvaluationOutput):
+    """prune이 이번 실행에서 재생/녹화하지 않은 엔트리만 파일에서 지우는지 테스트합니다."""
+    path = str(tmp_path / "v3.jsonl")
+    old_request = {**cassette_request, "system_prompt": "An older prompt."}
+    first_run = LLMCassette(path, mode="record")
+    first_run.record(old_request, llm_output, latency_ms=10.0)
+    first_run.record(cassette_request, llm_output, latency_ms=10.0)
+
+    # 프롬프트 수정 후의 실행: cassette_request만 재생하고 새 요청 하나를 녹화
+    new_request = {**cassette_request, "system_prompt": "A newer prompt."}
+    second_run = LLMCassette(path, mode="record")
+    assert second_run.lookup(cassette_request) == llm_output
+    assert second_run.lookup(new_request) is None
+    second_run.record(new_request, llm_output, latency_ms=10.0)
+
+    assert second_run.prune() == 1
+
+    player = LLMCassette(path, mode="replay")
+    assert len(player) == 2
+    assert player.lookup(new_request) == llm_output
+    with pytest.raises(CassetteMissError):
+        player.lookup(old_request)
+
+async def test_load_cassette_modes(tmp_path):
+    """'off'는 카세트를 끄고, 알 수 없는 모드는 ValueError를 발생시키는지 테스트합니다."""
+    assert load_cassette(str(tmp_path / "x.jsonl"), "off") is None
+    with pytest.raises(ValueError):
+        load_cassette(str(tmp_path / "x.jsonl"), "rewind")
+
+async def test_get_structured_evaluation_replays_without_llm(
+    mocker: MockerFixture, tmp_path, llm_output: RubricEvaluationOutput
+):
+    """카세트에 녹화본이 있으면 LLM 체인을 호출하지 않고 녹화된 응답을 반환하는지 테스트합니다."""
+    chain_mock = mocker.patch.object(llm_service, "chain")
+    chain_mock.ainvoke = mocker.AsyncMock(return_value=llm_output)
+
+    path = str(tmp_path / "v3.jsonl")
+    previous = llm_service.set_cassette(LLMCassette(path, mode="record"))
+    try:
+        first = await llm_service.get_structured_evaluation("system", "user")
+        llm_service.set_cassette(LLMCassette(path, mode="replay"))
+        second = await llm_service.get_structured_evaluation("system", "user")
+    finally:
+        llm_service.set_cassette(previous)
+
+    assert first == second == llm_output
+    chain_mock.ainvoke.assert_awaited_once()
+
+async def test_schema_change_causes_replay_miss(
+    mocker: MockerFixture, tmp_path, llm_output: RubricEvaluationOutput
+):
+    """출력 스키마가 바뀌면 이전 녹화본을 재생하지 않고 CassetteMissError가 발생하는지 테스트합니다."""
+    chain_mock = mocker.patch.object(llm_service, "chain")
+    chain_mock.ainvoke = mocker.AsyncMock(return_value=llm_output)
+
+    path = str(tmp_path / "v3.jsonl")
+    previous = llm_service.set_cassette(LLMCassette(path, mode="record"))
+    try:
+        await llm_service.get_structured_evaluation("system", "user")
+
+        changed_schema = RubricEvaluationOutput.model_json_schema()
+        changed_schema["properties"]["score"]["description"] = "The score for this rubric item, from 0 to 3."
+        mocker.patch.object(RubricEvaluationOutput, "model_json_schema", return_value=changed_schema)
+
+        llm_service.set_cassette(LLMCassette(path, mode="replay"))
+        with pytest.raises(CassetteMissError):
+            await llm_service.get_structured_evaluation("system", "user")
+    finally:
+        llm_service.set_cassette(previous)
+
+# --- Prompt Version Tests ---
+
+async def test_run_single_evaluation_uses_prompt_version(mocker: MockerFixture, llm_output: RubricEvaluationOutput):
+    """_run_single_evaluation이 지정한 프롬프트 버전의 템플릿으로 system prompt를 만드는지 테스트합니다."""
+    llm_mock = mocker.patch(
+        "app.services.evaluation_service.get_structured_evaluation",
+        return_value=llm_output
+    )
+    request = EssayEvaluationRequest(level_group="basic", topic_prompt="t", submit_text="I like dogs.")
+
+    await evaluation_service._run_single_evaluation(request, "body", prompt_version="v1")
+    await evaluation_service._run_single_evaluation(request, "body", prompt_version="v3")
+
+    v1_prompt = llm_mock.call_args_list[0].args[0]
+    v3_prompt = llm_mock.call_args_list[1].args[0]
+    assert v1_prompt == evaluation_service.get_prompt_template("v1").render(
+        rubric_item="body", topic_prompt="t", submit_text="I like dogs.", level_group="basic"
+    )
+    assert v1_prompt != v3_prompt
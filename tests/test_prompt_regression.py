@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.schemas import RubricEvaluationOutput
+from app.evals import prompt_regression
+from app.services.llm_cassette import LLMCassette
+
+# --- Fixtures ---
+
+@pytest.fixture
+def dataset_csv(tmp_path) -> str:
+    """rubric_level 컬럼과 빈 행을 포함한 작은 CSV 데이터셋."""
+    path = tmp_path / "essays.csv"
+    path.write_text(
+        "essay_id,rubric_level,topic_prompt,submit_text\n"
+        "7,basic,My pet,I have a dog. It is cute.\n"
+        ",,,\n"
+        "8,advanced,My town,My town is small but friendly.\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+def _scored(introduction: int, body: int, conclusion: int, grammar: int) -> dict:
+    return {
+        "scores": {"introduction": introduction, "body": body, "conclusion": conclusion, "grammar": grammar},
+        "error": None, "wall_ms": 10.0, "llm_est_ms": 30.0, "llm_total_ms": 40.0,
+    }
+
+# --- Dataset Loader Tests ---
+
+def test_load_dataset_csv(dataset_csv: str):
+    """CSV 로딩 시 rubric_level이 level_group으로 매핑되고 빈 행은 건너뛰는지 테스트합니다."""
+    essays = prompt_regression.load_dataset(dataset_csv)
+
+    assert [essay["essay_id"] for essay in essays] == ["7", "8"]
+    assert essays[0]["level_group"] == "basic"
+    assert essays[1]["topic_prompt"] == "My town"
+    assert essays[1]["submit_text"] == "My town is small but friendly."
+
+def test_load_dataset_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        prompt_regression.load_dataset(str(tmp_path / "essays.json"))
+
+def test_load_dataset_bundled_xlsx(tmp_path):
+    """번들 엑셀 데이터셋의 헤더 매핑, 행 수, _xHHHH_ 디코딩, 빈 level_group 행의 skip 처리를 테스트합니다."""
+    essays = prompt_regression.load_dataset("data/essay_writing_40_sample.xlsx")
+
+    assert len(essays) == 41
+    assert [essay["essay_id"] for essay in essays] == [str(i) for i in range(41)]
+    assert essays[0]["level_group"] == "basic"
+    assert essays[0]["topic_prompt"].startswith("Imagine you were surfing with your friend")
+    assert essays[0]["submit_text"].startswith("I will move to a higher ground.")
+    assert {essay["level_group"] for essay in essays[:40]} == {"basic", "intermediate", "advanced", "expert"}
+    # _x005F_ 는 '_' 로 디코딩되어야 하며 그대로 남아 있으면 안 됨
+    assert not any("_x005F" in value for essay in essays for value in essay.values())
+
+    # 40번 행은 level_group이 비어 있어 평가 대상에서 제외(skipped)되고, LLM 호출도 하지 않음
+    assert essays[40]["level_group"] == ""
+    cassette = LLMCassette(str(tmp_path / "v3.jsonl"), mode="replay")
+    results = asyncio.run(prompt_regression.run_prompt_version(essays[40:], "v3", cassette))
+    summary = prompt_regression.summarize_version(results)
+    assert summary["skipped"] == 1
+    assert summary["failed"] == 0
+    assert cassette.misses == 0
+
+# --- Report Tests ---
+
+def test_compute_agreement_with_missing_essays():
+    """기준/후보 어느 한쪽에만 있거나 채점되지 않은 에세이는 일치율 계산에서 제외되는지 테스트합니다."""
+    baseline = {
+        "a": _scored(2, 1, 0, 2),
+        "b": _scored(1, 1, 1, 1),
+        "only_baseline": _scored(0, 0, 0, 0),
+    }
+    candidate = {
+        "a": _scored(2, 2, 2, 2),
+        "b": _scored(0, 1, 1, 1),
+        "only_candidate": _scored(2, 2, 2, 2),
+        "skipped": {"scores": {}, "error": "invalid_language: ...", "wall_ms": 0.0, "llm_est_ms": 0.0, "llm_total_ms": 0.0},
+    }
+
+    agreement = prompt_regression.compute_agreement(baseline, candidate)
+
+    assert agreement["introduction"] == {"n": 2, "exact": 0.5, "adjacent": 1.0}
+    assert agreement["body"] == {"n": 2, "exact": 0.5, "adjacent": 1.0}
+    assert agreement["conclusion"] == {"n": 2, "exact": 0.5, "adjacent": 0.5}
+    assert agreement["grammar"] == {"n": 2, "exact": 1.0, "adjacent": 1.0}
+
+def test_summarize_version_counts():
+    """전처리/검증에서 걸러진 에세이는 skipped, 예외로 실패한 에세이는 failed로 집계되는지 테스트합니다."""
+    results = {
+        "a": _scored(2, 1, 0, 2),
+        "b": _scored(2, 2, 1, 1),
+        "skipped": {"scores": {}, "error": "validation_error: empty", "wall_ms": 0.0, "llm_est_ms": 0.0, "llm_total_ms": 0.0},
+        "failed": {"scores": {}, "error": "CassetteMissError: ...", "failed": True, "wall_ms": 1.0, "llm_est_ms": 0.0, "llm_total_ms": 0.0},
+    }
+
+    summary = prompt_regression.summarize_version(results)
+
+    assert summary["essays"] == 4
+    assert summary["scored"] == 2
+    assert summary["skipped"] == 1
+    assert summary["failed"] == 1
+    assert summary["distributions"]["introduction"] == {"counts": {"0": 0, "1": 0, "2": 2}, "mean": 2}
+    # 지연 시간은 채점된 에세이만 집계
+    assert summary["latency_ms"]["est_mean"] == 30.0
+    assert summary["latency_ms"]["wall_mean"] == 10.0
+    assert summary["latency_ms"]["llm_total_mean"] == 40.0
+
+def test_summarize_call_latency_uses_critical_path():
+    """구조 평가(순차)와 문법 평가(병렬) 중 더 긴 쪽이 예상 지연이 되는지 테스트합니다."""
+    def call(rubric_item: str, latency_ms: float) -> dict:
+        return {
+            "user_prompt": f"Please evaluate the provided essay for the '{rubric_item}' rubric item.",
+            "latency_ms": latency_ms,
+        }
+
+    latency = prompt_regression.summarize_call_latency([
+        call("introduction", 100.0), call("grammar", 250.0), call("body", 120.0), call("conclusion", 80.0),
+    ])
+    assert latency["llm_ms_by_rubric"] == {"introduction": 100.0, "body": 120.0, "conclusion": 80.0, "grammar": 250.0}
+    assert latency["llm_est_ms"] == 300.0
+    assert latency["llm_total_ms"] == 550.0
+
+    # 문법 평가가 구조 평가 전체보다 느리면 문법 평가 시간이 예상 지연
+    slow_grammar = prompt_regression.summarize_call_latency([call("introduction", 10.0), call("grammar", 90.0)])
+    assert slow_grammar["llm_est_ms"] == 90.0
+
+# --- CLI Exit Code Tests ---
+
+def test_main_replay_miss_exits_with_error(tmp_path, dataset_csv: str):
+    """replay 모드에서 카세트에 녹화본이 없으면 exit code 1을 반환하는지 테스트합니다."""
+    exit_code = prompt_regression.main([
+        "--mode", "replay",
+        "--dataset", dataset_csv,
+        "--cassette-dir", str(tmp_path / "cassettes"),
+    ])
+
+    assert exit_code == 1
+
+def test_main_replay_hit_exits_cleanly(mocker, tmp_path, dataset_csv: str):
+    """record로 채운 카세트를 replay하면 LLM 호출 없이 exit code 0을 반환하는지 테스트합니다."""
+    cassette_dir = str(tmp_path / "cassettes")
+    chain_mock = mocker.patch("app.services.llm_service.chain")
+    chain_mock.ainvoke = mocker.AsyncMock(
+        return_value=RubricEvaluationOutput(score=2, corrections=[], feedback="Recorded.")
+    )
+    common_args = ["--dataset", dataset_csv, "--cassette-dir", cassette_dir, "--cassette-model", "gpt-4o-mini"]
+
+    assert prompt_regression.main(["--mode", "record", *common_args]) == 0
+    recorded_calls = chain_mock.ainvoke.await_count
+    assert len(LLMCassette(f"{cassette_dir}/v3.jsonl", mode="replay")) == recorded_calls
+
+    assert prompt_regression.main(["--mode", "replay", *common_args]) == 0
+    assert chain_mock.ainvoke.await_count == recorded_calls